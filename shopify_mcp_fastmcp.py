@@ -7,13 +7,37 @@ This implementation follows the same pattern as the working weather MCP server.
 
 import os
 import sys
-import shopify
+import json
+import requests
+import threading
+import time
+import functools
 import traceback
 import logging
-import asyncio
 from typing import Any, Dict, List, Optional
 from mcp.server.fastmcp import FastMCP
 
+# The shopify SDK drags in pyactiveresource, PyYAML and PyJWT, a noticeable
+# chunk of interpreter start-up, and the GraphQL tools don't need it at all.
+# It is imported on first use (init / first REST tool call) so the MCP
+# handshake isn't delayed behind it.
+shopify = None
+
+# orjson decodes the multi-MB GraphQL payloads several times faster than the
+# stdlib parser; fall back to json transparently when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+def _import_shopify() -> None:
+    """Import the shopify SDK on first use."""
+    global shopify
+    if shopify is None:
+        import shopify as _shopify_module
+        shopify = _shopify_module
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -22,73 +46,389 @@ logging.basicConfig(
 )
 logger = logging.getLogger('shopify_mcp')
 
+def _debug_stack_trace() -> None:
+    """
+    Log the active exception's traceback at DEBUG level.
+
+    Checks isEnabledFor first so traceback.format_exc() - which walks and
+    renders the whole stack - is never evaluated when DEBUG is filtered out.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Stack trace: %s", traceback.format_exc())
+
 # Initialize FastMCP server
 mcp = FastMCP("shopify_mcp_server")
 
+# =================================================================================================
+# CONCURRENCY CONTROL
+# =================================================================================================
+
+# FastMCP runs each synchronous tool call on its own worker thread, so several
+# tools can be in flight at the same time. Shopify's REST bucket refills at
+# roughly 2 requests/second, so cap how many calls hit the API concurrently
+# instead of letting every worker thread pile on at once.
+SHOPIFY_MAX_CONCURRENT_CALLS = 4
+_api_limiter = threading.BoundedSemaphore(SHOPIFY_MAX_CONCURRENT_CALLS)
+
+# =================================================================================================
+# RESPONSE CACHING
+# =================================================================================================
+
+CACHE_TTL_SECONDS = 60
+CACHE_MAX_ENTRIES = 128
+
+def _ttl_cache(ttl: float = CACHE_TTL_SECONDS, maxsize: int = CACHE_MAX_ENTRIES):
+    """
+    Cache a function's result in memory for `ttl` seconds, keyed by its arguments.
+
+    Shop metadata and product/customer/order lists change on human timescales,
+    so repeated tool calls within the TTL are answered from memory instead of
+    re-hitting the Shopify API. The cache is guarded by a lock so it is safe
+    under FastMCP's threaded tool execution, and the entry closest to expiry
+    is evicted once maxsize is reached.
+    """
+    def decorator(func):
+        cache: Dict[Any, Any] = {}  # key -> (expires_at, value)
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    logger.debug("Cache hit for %s with key=%s", func.__name__, key)
+                    return entry[1]
+            result = func(*args, **kwargs)
+            # The tools report failure by returning an empty []/{} sentinel;
+            # caching one would serve a transient Shopify error (429, timeout)
+            # as a confidently empty payload for the whole TTL. Let empty
+            # results through uncached so the next call retries.
+            if not result:
+                return result
+            with lock:
+                if len(cache) >= maxsize:
+                    oldest = min(cache, key=lambda k: cache[k][0])
+                    del cache[oldest]
+                cache[key] = (now + ttl, result)
+            return result
+        return wrapper
+    return decorator
+
+# =================================================================================================
+# GRAPHQL HELPERS
+# =================================================================================================
+
+# Shopify's per-page maximum for connection fields
+PRODUCTS_PAGE_SIZE = 250
+
+# Ask only for the fields the tools actually return, instead of pulling the
+# full REST representation of every product. Cursor pagination ($after) is
+# used in place of REST page walking.
+_PRODUCTS_QUERY = """
+query Products($first: Int!, $after: String) {
+  products(first: $first, after: $after) {
+    pageInfo { hasNextPage endCursor }
+    edges {
+      node {
+        legacyResourceId
+        title
+        descriptionHtml
+        productType
+        vendor
+        tags
+        createdAt
+        updatedAt
+        variants(first: 100) {
+          edges { node { legacyResourceId title price sku inventoryQuantity } }
+        }
+        images(first: 250) {
+          edges { node { id url } }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Single-product lookup with the same field selection as _PRODUCTS_QUERY
+_PRODUCT_DETAILS_QUERY = """
+query ProductDetails($id: ID!) {
+  product(id: $id) {
+    legacyResourceId
+    title
+    descriptionHtml
+    productType
+    vendor
+    tags
+    createdAt
+    updatedAt
+    variants(first: 100) {
+      edges { node { legacyResourceId title price sku inventoryQuantity } }
+    }
+    images(first: 250) {
+      edges { node { id url } }
+    }
+  }
+}
+"""
+
+# Search-specific variant of the products query: matching happens server-side
+# via the 'query' argument, and only the fields search results return are
+# selected (first image only, no timestamps or inventory).
+_PRODUCT_SEARCH_QUERY = """
+query SearchProducts($first: Int!, $query: String!) {
+  products(first: $first, query: $query) {
+    edges {
+      node {
+        legacyResourceId
+        title
+        descriptionHtml
+        productType
+        vendor
+        tags
+        variants(first: 100) {
+          edges { node { legacyResourceId title price sku } }
+        }
+        images(first: 1) {
+          edges { node { url } }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Persistent HTTP session for GraphQL calls. Reusing one session keeps the
+# TCP+TLS connection to Shopify alive between calls (the SDK's urllib-based
+# transport reconnects on every request), so repeat queries skip the
+# handshake entirely. Configured by init_shopify_api().
+_http = requests.Session()
+_http.headers['Accept'] = 'application/json'
+_graphql_endpoint: Optional[str] = None
+
+def _graphql(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Execute a GraphQL query against the Shopify Admin API.
+
+    Args:
+        query: The GraphQL query document
+        variables: Optional variables for the query
+
+    Returns:
+        The 'data' portion of the parsed response
+    """
+    with _api_limiter:
+        response = _http.post(
+            _graphql_endpoint,
+            json={'query': query, 'variables': variables or {}},
+            timeout=30
+        )
+    response.raise_for_status()
+    payload = _json_loads(response.content)
+    if payload.get('errors'):
+        raise RuntimeError(f"GraphQL query failed: {payload['errors']}")
+    return payload['data']
+
+def _legacy_id(gid: str) -> int:
+    """Extract the numeric REST ID from a GraphQL gid:// identifier."""
+    return int(str(gid).rsplit('/', 1)[-1])
+
+def _product_node_to_dict(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a GraphQL product node to the dict shape the REST-era tools
+    returned (numeric IDs, comma-separated tags, 1-based image positions).
+    """
+    return {
+        'id': int(node['legacyResourceId']),
+        'title': node['title'],
+        'description': node['descriptionHtml'],
+        'product_type': node['productType'],
+        'vendor': node['vendor'],
+        'tags': ', '.join(node['tags']),
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        # Variant information
+        'variants': [
+            {
+                'id': int(variant['legacyResourceId']),
+                'title': variant['title'],
+                'price': variant['price'],
+                'sku': variant['sku'],
+                'inventory_quantity': variant['inventoryQuantity']
+            }
+            for variant in (edge['node'] for edge in node['variants']['edges'])
+        ],
+        # Image information (position is the 1-based order in the list)
+        'images': [
+            {
+                'id': _legacy_id(image['id']),
+                'src': image['url'],
+                'position': position
+            }
+            for position, image in enumerate(
+                (edge['node'] for edge in node['images']['edges']), start=1)
+        ]
+    }
+
 # =================================================================================================
 # SHOPIFY API INITIALIZATION
 # =================================================================================================
 
+# The constructed shopify.Session is cached here so init_shopify_api is
+# idempotent: repeat calls return immediately instead of re-reading the
+# environment, rebuilding the session and re-fetching Shop.current().
+_init_lock = threading.Lock()
+_shopify_session: Optional[Any] = None
+
+# Tracks which worker threads have activated the Shopify session for themselves
+_thread_state = threading.local()
+
 def init_shopify_api() -> bool:
     """
     Initialize the Shopify API client using environment variables.
-    
+
     Required environment variables:
     - SHOPIFY_SHOP_URL: The URL of your Shopify store (e.g., 'your-store.myshopify.com')
     - Either SHOPIFY_ACCESS_TOKEN or both SHOPIFY_API_KEY and SHOPIFY_PASSWORD
     - Optional SHOPIFY_API_VERSION: Defaults to '2023-01' if not specified
-    
+
+    Safe to call more than once: the configured session is built (and the
+    connection verified) only on the first successful call.
+
     Returns:
         bool: True if initialization was successful, False otherwise
     """
-    # Get required environment variables
-    shop_url = os.environ.get('SHOPIFY_SHOP_URL')
-    api_key = os.environ.get('SHOPIFY_API_KEY')
-    password = os.environ.get('SHOPIFY_PASSWORD')
-    access_token = os.environ.get('SHOPIFY_ACCESS_TOKEN')
-    api_version = os.environ.get('SHOPIFY_API_VERSION', '2023-01')
-    
-    # Validate that we have the necessary credentials
-    if not shop_url:
-        logger.error("SHOPIFY_SHOP_URL environment variable is required")
-        return False
-    
-    if not (access_token or (api_key and password)):
-        logger.error("Either SHOPIFY_ACCESS_TOKEN or both SHOPIFY_API_KEY and SHOPIFY_PASSWORD must be provided")
-        return False
-    
-    try:
-        logger.debug(f"Initializing Shopify API with shop_url={shop_url} and api_version={api_version}")
-        
-        # Configure the Shopify session with the appropriate authentication method
-        if access_token:
-            # Private app authentication with access token
-            logger.debug("Using access token authentication")
-            session = shopify.Session(shop_url, api_version, access_token)
-        else:
-            # API key + password authentication
-            logger.debug("Using API key + password authentication")
-            session = shopify.Session(shop_url, api_version)
-            session.shop_url = shop_url
-            shopify.ShopifyResource.set_site(f"https://{api_key}:{password}@{shop_url}/admin/api/{api_version}")
-        
-        shopify.ShopifyResource.activate_session(session)
-        
-        # Test the connection by retrieving the shop information
-        shop = shopify.Shop.current()
-        logger.debug(f"Successfully connected to Shopify shop: {shop.name}")
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error initializing Shopify API: {e}")
-        logger.debug(f"Stack trace: {traceback.format_exc()}")
-        return False
+    global _shopify_session, _graphql_endpoint
+
+    _import_shopify()
+
+    with _init_lock:
+        # Reuse the already-constructed session if initialization succeeded before
+        if _shopify_session is not None:
+            return True
+
+        # Get required environment variables
+        shop_url = os.environ.get('SHOPIFY_SHOP_URL')
+        api_key = os.environ.get('SHOPIFY_API_KEY')
+        password = os.environ.get('SHOPIFY_PASSWORD')
+        access_token = os.environ.get('SHOPIFY_ACCESS_TOKEN')
+        api_version = os.environ.get('SHOPIFY_API_VERSION', '2023-01')
+
+        # Validate that we have the necessary credentials
+        if not shop_url:
+            logger.error("SHOPIFY_SHOP_URL environment variable is required")
+            return False
+
+        if not (access_token or (api_key and password)):
+            logger.error("Either SHOPIFY_ACCESS_TOKEN or both SHOPIFY_API_KEY and SHOPIFY_PASSWORD must be provided")
+            return False
+
+        try:
+            logger.debug("Initializing Shopify API with shop_url=%s and api_version=%s", shop_url, api_version)
+
+            # Configure the Shopify session with the appropriate authentication method
+            if access_token:
+                # Private app authentication with access token
+                logger.debug("Using access token authentication")
+                session = shopify.Session(shop_url, api_version, access_token)
+            else:
+                # API key + password authentication
+                logger.debug("Using API key + password authentication")
+                session = shopify.Session(shop_url, api_version)
+                session.shop_url = shop_url
+                shopify.ShopifyResource.set_site(f"https://{api_key}:{password}@{shop_url}/admin/api/{api_version}")
+
+            shopify.ShopifyResource.activate_session(session)
+
+            # Point the persistent GraphQL session at this shop with the same credentials
+            _graphql_endpoint = f"https://{shop_url}/admin/api/{api_version}/graphql.json"
+            if access_token:
+                _http.headers['X-Shopify-Access-Token'] = access_token
+            else:
+                _http.auth = (api_key, password)
+
+            # Test the connection by retrieving the shop information
+            shop = shopify.Shop.current()
+            logger.debug("Successfully connected to Shopify shop: %s", shop.name)
+
+            _shopify_session = session
+            return True
+        except Exception as e:
+            logger.error("Error initializing Shopify API: %s", e)
+            _debug_stack_trace()
+            return False
+
+def _ensure_session() -> None:
+    """
+    Activate the cached Shopify session for the current thread.
+
+    shopify.ShopifyResource keeps its active session in shared class state,
+    and FastMCP runs each tool call on a worker thread that may not be the
+    one init_shopify_api ran on. Re-activating the cached session once per
+    thread keeps every worker pointed at the same shop regardless of how the
+    SDK scopes its connection state, and avoids racing on a half-switched
+    global session.
+    """
+    if getattr(_thread_state, 'session_active', False):
+        return
+    _import_shopify()
+    if _shopify_session is not None:
+        shopify.ShopifyResource.activate_session(_shopify_session)
+    _thread_state.session_active = True
+
+# =================================================================================================
+# RESPONSE TRANSFORMS
+# =================================================================================================
+
+# The list and detail tools return identical shapes, so the object-to-dict
+# conversions live here instead of being repeated inline in each tool.
+# Flat shapes whose response keys match the REST attribute names are
+# described as key tuples and projected with _pick.
+
+_ADDRESS_KEYS = ('address1', 'city', 'province', 'country', 'zip')
+_LINE_ITEM_KEYS = ('id', 'title', 'quantity', 'price', 'sku',
+                   'product_id', 'variant_id')
+
+def _pick(attrs: Dict[str, Any], keys: tuple) -> Dict[str, Any]:
+    """Build a response dict by picking the given keys out of an attribute dict."""
+    return {key: attrs.get(key) for key in keys}
+
+def _address_to_dict(address: Any) -> Dict[str, Any]:
+    """Convert a Shopify Address resource to the tool response dict."""
+    return _pick(address.attributes, _ADDRESS_KEYS)
+
+def _customer_to_dict(customer: Any) -> Dict[str, Any]:
+    """Convert a Shopify Customer resource to the tool response dict."""
+    customer_dict = {
+        'id': customer.id,
+        'email': customer.email,
+        'first_name': customer.first_name,
+        'last_name': customer.last_name,
+        'orders_count': customer.orders_count,
+        'total_spent': customer.total_spent,
+        # REST payloads deliver timestamps as ISO-8601 strings already;
+        # no conversion needed
+        'created_at': customer.created_at,
+        'addresses': []
+    }
+
+    # Add address information if available; checking the attribute dict
+    # directly avoids probing __getattr__ twice the way hasattr does
+    addresses = customer.attributes.get('addresses')
+    if addresses:
+        customer_dict['addresses'] = [_address_to_dict(address)
+                                      for address in addresses]
+
+    return customer_dict
 
 # =================================================================================================
 # MCP TOOL IMPLEMENTATIONS
 # =================================================================================================
 
 @mcp.tool()
+@_ttl_cache()
 def get_products(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get a list of products from the Shopify store.
@@ -100,59 +440,33 @@ def get_products(limit: int = 10) -> List[Dict[str, Any]]:
         List of product objects with details
     """
     try:
-        logger.debug(f"Fetching products with limit={limit}")
-        
-        # Fetch products from Shopify API with the specified limit (without page parameter)
-        products = shopify.Product.find(limit=limit)
-        logger.debug(f"Found {len(products)} products")
-        
+        logger.debug("Fetching products with limit=%s", limit)
+
+        # Fetch products through GraphQL, selecting only the fields we return.
+        # Walk the cursor for limits beyond Shopify's 250-per-page cap.
+        edges = []
+        cursor = None
+        while len(edges) < limit:
+            variables = {'first': min(limit - len(edges), PRODUCTS_PAGE_SIZE), 'after': cursor}
+            connection = _graphql(_PRODUCTS_QUERY, variables)['products']
+            edges.extend(connection['edges'])
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            cursor = connection['pageInfo']['endCursor']
+        logger.debug("Found %d products", len(edges))
+
         # Transform the API response into a more usable format
-        product_list = []
-        for product in products:
-            # Convert the Shopify Product object to a dictionary
-            product_dict = {
-                'id': product.id,
-                'title': product.title,
-                'description': product.body_html,
-                'product_type': product.product_type,
-                'vendor': product.vendor,
-                'tags': product.tags,
-                'created_at': str(product.created_at),
-                'updated_at': str(product.updated_at),
-                'variants': [],
-                'images': []
-            }
-            
-            # Add variant information
-            for variant in product.variants:
-                variant_dict = {
-                    'id': variant.id,
-                    'title': variant.title,
-                    'price': variant.price,
-                    'sku': variant.sku,
-                    'inventory_quantity': variant.inventory_quantity
-                }
-                product_dict['variants'].append(variant_dict)
-            
-            # Add image information
-            for image in product.images:
-                image_dict = {
-                    'id': image.id,
-                    'src': image.src,
-                    'position': image.position
-                }
-                product_dict['images'].append(image_dict)
-                
-            product_list.append(product_dict)
-        
-        logger.debug(f"Processed {len(product_list)} products successfully")
+        product_list = [_product_node_to_dict(edge['node']) for edge in edges]
+
+        logger.debug("Processed %d products successfully", len(product_list))
         return product_list
     except Exception as e:
-        logger.error(f"Error retrieving products: {e}")
-        logger.debug(f"Stack trace: {traceback.format_exc()}")
+        logger.error("Error retrieving products: %s", e)
+        _debug_stack_trace()
         return []
 
 @mcp.tool()
+@_ttl_cache()
 def get_product_details(product_id: str) -> Dict[str, Any]:
     """
     Get detailed information about a specific product.
@@ -164,48 +478,22 @@ def get_product_details(product_id: str) -> Dict[str, Any]:
         Detailed product information
     """
     try:
-        product = shopify.Product.find(product_id)
-        
-        # Convert the Shopify Product object to a dictionary
-        product_dict = {
-            'id': product.id,
-            'title': product.title,
-            'description': product.body_html,
-            'product_type': product.product_type,
-            'vendor': product.vendor,
-            'tags': product.tags,
-            'created_at': str(product.created_at),
-            'updated_at': str(product.updated_at),
-            'variants': [],
-            'images': []
-        }
-        
-        # Add variant information
-        for variant in product.variants:
-            variant_dict = {
-                'id': variant.id,
-                'title': variant.title,
-                'price': variant.price,
-                'sku': variant.sku,
-                'inventory_quantity': variant.inventory_quantity
-            }
-            product_dict['variants'].append(variant_dict)
-        
-        # Add image information
-        for image in product.images:
-            image_dict = {
-                'id': image.id,
-                'src': image.src,
-                'position': image.position
-            }
-            product_dict['images'].append(image_dict)
-            
-        return product_dict
+        # Fetch the single product through GraphQL with the same field
+        # selection as get_products
+        data = _graphql(_PRODUCT_DETAILS_QUERY,
+                        {'id': f"gid://shopify/Product/{product_id}"})
+        node = data['product']
+        if node is None:
+            logger.error("Product %s not found", product_id)
+            return {}
+
+        return _product_node_to_dict(node)
     except Exception as e:
-        logger.error(f"Error retrieving product details: {e}")
+        logger.error("Error retrieving product details: %s", e)
         return {}
 
 @mcp.tool()
+@_ttl_cache()
 def get_customers(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get a list of customers from the Shopify store.
@@ -217,46 +505,22 @@ def get_customers(limit: int = 10) -> List[Dict[str, Any]]:
         List of customer objects with details
     """
     try:
-        logger.debug(f"Fetching customers with limit={limit}")
+        _ensure_session()
+        logger.debug("Fetching customers with limit=%s", limit)
         
         # Fetch customers from Shopify API with the specified limit
-        customers = shopify.Customer.find(limit=limit)
-        logger.debug(f"Found {len(customers)} customers")
+        with _api_limiter:
+            customers = shopify.Customer.find(limit=limit)
+        logger.debug("Found %d customers", len(customers))
         
         # Transform the API response into a more usable format
-        customer_list = []
-        for customer in customers:
-            # Convert the Shopify Customer object to a dictionary
-            customer_dict = {
-                'id': customer.id,
-                'email': customer.email,
-                'first_name': customer.first_name,
-                'last_name': customer.last_name,
-                'orders_count': customer.orders_count,
-                'total_spent': customer.total_spent,
-                'created_at': str(customer.created_at),
-                'addresses': []
-            }
-            
-            # Add address information if available
-            if hasattr(customer, 'addresses'):
-                for address in customer.addresses:
-                    address_dict = {
-                        'address1': address.address1,
-                        'city': address.city,
-                        'province': address.province,
-                        'country': address.country,
-                        'zip': address.zip
-                    }
-                    customer_dict['addresses'].append(address_dict)
-                
-            customer_list.append(customer_dict)
-        
-        logger.debug(f"Processed {len(customer_list)} customers successfully")
+        customer_list = [_customer_to_dict(customer) for customer in customers]
+
+        logger.debug("Processed %d customers successfully", len(customer_list))
         return customer_list
     except Exception as e:
-        logger.error(f"Error retrieving customers: {e}")
-        logger.debug(f"Stack trace: {traceback.format_exc()}")
+        logger.error("Error retrieving customers: %s", e)
+        _debug_stack_trace()
         return []
 
 @mcp.tool()
@@ -271,38 +535,27 @@ def get_customer_details(customer_id: str) -> Dict[str, Any]:
         Detailed customer information
     """
     try:
-        customer = shopify.Customer.find(customer_id)
-        
+        _ensure_session()
+        with _api_limiter:
+            customer = shopify.Customer.find(customer_id)
+
         # Convert the Shopify Customer object to a dictionary
-        customer_dict = {
-            'id': customer.id,
-            'email': customer.email,
-            'first_name': customer.first_name,
-            'last_name': customer.last_name,
-            'orders_count': customer.orders_count,
-            'total_spent': customer.total_spent,
-            'created_at': str(customer.created_at),
-            'addresses': []
-        }
-        
-        # Add address information if available
-        if hasattr(customer, 'addresses'):
-            for address in customer.addresses:
-                address_dict = {
-                    'address1': address.address1,
-                    'city': address.city,
-                    'province': address.province,
-                    'country': address.country,
-                    'zip': address.zip
-                }
-                customer_dict['addresses'].append(address_dict)
-        
-        return customer_dict
+        return _customer_to_dict(customer)
     except Exception as e:
-        logger.error(f"Error retrieving customer details: {e}")
+        logger.error("Error retrieving customer details: %s", e)
         return {}
 
+# Order fields requested over REST: exactly what the transform returns, with
+# customer and shipping_address named explicitly so they arrive embedded in
+# the same payload instead of depending on Shopify's default field set.
+_ORDER_FIELDS = ','.join((
+    'id', 'order_number', 'email', 'created_at', 'total_price',
+    'subtotal_price', 'total_tax', 'currency', 'financial_status',
+    'fulfillment_status', 'customer', 'shipping_address', 'line_items'
+))
+
 @mcp.tool()
+@_ttl_cache()
 def get_orders(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get a list of orders from the Shopify store.
@@ -314,11 +567,21 @@ def get_orders(limit: int = 10) -> List[Dict[str, Any]]:
         List of order objects with details
     """
     try:
-        logger.debug(f"Fetching orders with limit={limit}")
+        _ensure_session()
+        logger.debug("Fetching orders with limit=%s", limit)
         
-        # Fetch orders from Shopify API with the specified limit
-        orders = shopify.Order.find(limit=limit)
-        logger.debug(f"Found {len(orders)} orders")
+        # Fetch orders from Shopify API with the specified limit, following
+        # Link-header cursors when the limit exceeds the 250-per-page cap
+        # (the SDK's next_page() walks the rel="next" cursor for us)
+        with _api_limiter:
+            page = shopify.Order.find(limit=min(limit, 250), fields=_ORDER_FIELDS)
+        orders = list(page)
+        while len(orders) < limit and page.has_next_page():
+            with _api_limiter:
+                page = page.next_page()
+            orders.extend(page)
+        orders = orders[:limit]
+        logger.debug("Found %d orders", len(orders))
         
         # Transform the API response into a more usable format
         order_list = []
@@ -328,7 +591,7 @@ def get_orders(limit: int = 10) -> List[Dict[str, Any]]:
                 'id': order.id,
                 'order_number': order.order_number,
                 'email': order.email,
-                'created_at': str(order.created_at),
+                'created_at': order.created_at,
                 'total_price': order.total_price,
                 'subtotal_price': order.subtotal_price,
                 'total_tax': order.total_tax,
@@ -340,50 +603,40 @@ def get_orders(limit: int = 10) -> List[Dict[str, Any]]:
                 'line_items': []
             }
             
-            # Add customer information if available
-            if hasattr(order, 'customer') and order.customer:
+            # Add customer information if available; optional sub-resources
+            # are looked up in the attribute dict rather than via hasattr
+            customer = order.attributes.get('customer')
+            if customer:
+                customer_attrs = customer.attributes
                 order_dict['customer'] = {
-                    'id': order.customer.id,
-                    'email': order.customer.email,
-                    'first_name': order.customer.first_name,
-                    'last_name': order.customer.last_name
-                }
-            
-            # Add shipping address information if available
-            if hasattr(order, 'shipping_address') and order.shipping_address:
-                address = order.shipping_address
-                order_dict['shipping_address'] = {
-                    'name': address.name,
-                    'address1': address.address1,
-                    'city': address.city,
-                    'province': address.province,
-                    'country': address.country,
-                    'zip': address.zip
+                    'id': customer_attrs.get('id'),
+                    'email': customer_attrs.get('email'),
+                    'first_name': customer_attrs.get('first_name'),
+                    'last_name': customer_attrs.get('last_name')
                 }
+
+            # Add shipping address information if available (same shape as a
+            # customer address plus the recipient name)
+            address = order.attributes.get('shipping_address')
+            if address:
+                order_dict['shipping_address'] = {'name': address.attributes.get('name'),
+                                                  **_address_to_dict(address)}
             
             # Add line item information
-            for item in order.line_items:
-                item_dict = {
-                    'id': item.id,
-                    'title': item.title,
-                    'quantity': item.quantity,
-                    'price': item.price,
-                    'sku': item.sku,
-                    'product_id': item.product_id,
-                    'variant_id': item.variant_id
-                }
-                order_dict['line_items'].append(item_dict)
-                
+            order_dict['line_items'] = [_pick(item.attributes, _LINE_ITEM_KEYS)
+                                        for item in order.line_items]
+
             order_list.append(order_dict)
         
-        logger.debug(f"Processed {len(order_list)} orders successfully")
+        logger.debug("Processed %d orders successfully", len(order_list))
         return order_list
     except Exception as e:
-        logger.error(f"Error retrieving orders: {e}")
-        logger.debug(f"Stack trace: {traceback.format_exc()}")
+        logger.error("Error retrieving orders: %s", e)
+        _debug_stack_trace()
         return []
 
 @mcp.tool()
+@_ttl_cache()
 def search_products(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Search for products by title, vendor, or product type.
@@ -396,21 +649,82 @@ def search_products(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         List of matching products
     """
     try:
-        # For better search, we'll get a larger list and filter manually
-        # since the Shopify API's search capabilities can be limited
-        products = shopify.Product.find(limit=50)
-        
-        # Manually filter products by query term
+        logger.debug("Searching products for query=%r with limit=%s", query, limit)
+
+        # Let Shopify do the matching server-side instead of pulling 50
+        # products and filtering them here. The user-supplied term is escaped
+        # and quoted so spaces and DSL operators (OR, -, field: prefixes)
+        # cannot rewrite the search semantics.
+        safe = query.replace('\\', '\\\\').replace('"', '\\"')
+        search = (f'title:"{safe}" OR vendor:"{safe}" '
+                  f'OR product_type:"{safe}" OR tag:"{safe}"')
+        data = _graphql(_PRODUCT_SEARCH_QUERY,
+                        {'first': min(limit, PRODUCTS_PAGE_SIZE), 'query': search})
+
+        matched_products = []
+        for edge in data['products']['edges']:
+            node = edge['node']
+            # Convert the matching product to a dictionary
+            product_dict = {
+                'id': int(node['legacyResourceId']),
+                'title': node['title'],
+                'description': node['descriptionHtml'],
+                'product_type': node['productType'],
+                'vendor': node['vendor'],
+                'tags': ', '.join(node['tags']),
+                # Variant information
+                'variants': [
+                    {
+                        'id': int(variant['legacyResourceId']),
+                        'title': variant['title'],
+                        'price': variant['price'],
+                        'sku': variant['sku']
+                    }
+                    for variant in (variant_edge['node']
+                                    for variant_edge in node['variants']['edges'])
+                ],
+                'images': []
+            }
+
+            # Add image information (just the first image)
+            if node['images']['edges']:
+                product_dict['image'] = {
+                    'src': node['images']['edges'][0]['node']['url']
+                }
+
+            matched_products.append(product_dict)
+
+        return matched_products
+    except Exception as e:
+        logger.error("Error searching products server-side, falling back to local filter: %s", e)
+        return _search_products_local(query, limit)
+
+def _search_products_local(query: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Fallback search: fetch a batch of products over REST and filter locally.
+
+    Used only when the server-side GraphQL search fails (e.g. an API version
+    that does not support the query syntax).
+    """
+    try:
+        _ensure_session()
+        with _api_limiter:
+            products = shopify.Product.find(limit=50)
+
+        # Manually filter products by query term; the query is lowercased once
+        # up front rather than per comparison
         query = query.lower()
         matched_products = []
-        
+
         for product in products:
-            # Check if the query matches any of the searchable fields
-            if (query in product.title.lower() or 
-                query in product.vendor.lower() or 
-                query in product.product_type.lower() or
-                query in product.tags.lower()):
-                
+            # Build a single lowercase haystack per product so matching is one
+            # containment check instead of four field-by-field .lower() scans.
+            # The \0 separator can't appear in a query, so a multi-word term
+            # never matches across a field boundary.
+            haystack = '\0'.join((product.title, product.vendor,
+                                  product.product_type, product.tags)).lower()
+            if query in haystack:
+
                 # Convert the matching product to a dictionary
                 product_dict = {
                     'id': product.id,
@@ -422,35 +736,37 @@ def search_products(query: str, limit: int = 10) -> List[Dict[str, Any]]:
                     'variants': [],
                     'images': []
                 }
-                
-                # Add variant information
+
+                # Add variant information, reading the attribute dict directly
                 for variant in product.variants:
+                    attrs = variant.attributes
                     variant_dict = {
-                        'id': variant.id,
-                        'title': variant.title,
-                        'price': variant.price,
-                        'sku': variant.sku
+                        'id': attrs.get('id'),
+                        'title': attrs.get('title'),
+                        'price': attrs.get('price'),
+                        'sku': attrs.get('sku')
                     }
                     product_dict['variants'].append(variant_dict)
-                
+
                 # Add image information (just the first image)
                 if product.images:
                     image = product.images[0]
                     product_dict['image'] = {
                         'src': image.src
                     }
-                    
+
                 matched_products.append(product_dict)
-                
+
                 if len(matched_products) >= limit:
                     break
-        
+
         return matched_products
     except Exception as e:
-        logger.error(f"Error searching products: {e}")
+        logger.error("Error searching products: %s", e)
         return []
 
 @mcp.tool()
+@_ttl_cache()
 def get_store_info() -> Dict[str, Any]:
     """
     Get information about the Shopify store.
@@ -459,8 +775,10 @@ def get_store_info() -> Dict[str, Any]:
         Dictionary with store details
     """
     try:
+        _ensure_session()
         # Fetch shop information from Shopify API
-        shop = shopify.Shop.current()
+        with _api_limiter:
+            shop = shopify.Shop.current()
         
         # Convert the Shopify Shop object to a dictionary
         shop_info = {
@@ -474,7 +792,7 @@ def get_store_info() -> Dict[str, Any]:
             'zip': shop.zip,
             'city': shop.city,
             'phone': shop.phone,
-            'created_at': str(shop.created_at),
+            'created_at': shop.created_at,
             'shop_owner': shop.shop_owner,
             'plan_name': shop.plan_name,
             'has_storefront': shop.has_storefront,
@@ -488,7 +806,7 @@ def get_store_info() -> Dict[str, Any]:
         
         return shop_info
     except Exception as e:
-        logger.error(f"Error retrieving store information: {e}")
+        logger.error("Error retrieving store information: %s", e)
         return {}
 
 # =================================================================================================
@@ -509,6 +827,6 @@ if __name__ == "__main__":
         # Run the MCP server with stdio transport (for Claude Desktop)
         mcp.run(transport='stdio')
     except Exception as e:
-        logger.error(f"Error running MCP server: {e}")
-        logger.debug(f"Stack trace: {traceback.format_exc()}")
+        logger.error("Error running MCP server: %s", e)
+        _debug_stack_trace()
         sys.exit(1) 
\ No newline at end of file